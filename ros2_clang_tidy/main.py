@@ -1,24 +1,48 @@
 #!/usr/bin/env python3
 
 import argparse
+import functools
+import hashlib
 import json
 import os
+import re
 import subprocess
 import sys
-from multiprocessing.pool import ThreadPool
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import BinaryIO, Dict, List, Optional, Tuple
 
 import argcomplete
 import tqdm
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+@functools.lru_cache(maxsize=None)
+def resolve_path(path: str) -> Path:
+    """
+    Resolve a path to its canonical absolute form, caching the result.
+
+    Args:
+        path: The path to resolve.
+
+    Returns:
+        The resolved Path.
+    """
+    return Path(path).resolve()
+
 
 def get_all_packages() -> Dict[str, Path]:
     """
     Retrieve all packages by scanning the 'install' directory.
 
     Returns:
-        A dictionary mapping package names to their respective package.xml paths.
+        A dictionary mapping package names to the resolved directories containing
+        their package.xml.
 
     Raises:
         FileNotFoundError: If the 'install' directory does not exist.
@@ -38,7 +62,7 @@ def get_all_packages() -> Dict[str, Path]:
             )
             if not package_xml_path.exists():
                 continue
-            packages_to_paths[package_name] = package_xml_path.resolve().parent
+            packages_to_paths[package_name] = resolve_path(str(package_xml_path)).parent
 
     return packages_to_paths
 
@@ -50,57 +74,79 @@ def filter_packages_by_base_path(
     Filter packages based on a specified base path.
 
     Args:
-        packages: A dictionary of package names and their paths.
+        packages: A dictionary of package names and their resolved paths.
         base_path: The base directory to filter packages against.
 
     Returns:
         A dictionary of packages that are relative to the base path.
     """
-    base_directory = Path(base_path).resolve()
+    base_directory = resolve_path(base_path)
     filtered_packages = {
         name: path
         for name, path in packages.items()
-        if path.resolve().is_relative_to(base_directory)
+        if path.is_relative_to(base_directory)
     }
     return filtered_packages
 
 
-def find_cpp_files(package_path: Path) -> List[Path]:
+CPP_SOURCE_SUFFIXES = (".cpp", ".cc", ".c")
+
+# Package logs are written through a large buffer so that many small reports
+# are flushed in few write syscalls, which matters on network filesystems.
+LOG_BUFFER_SIZE = 1024 * 1024
+
+
+def load_compile_commands(package_name: str) -> List[Dict[str, str]]:
     """
-    Recursively find all C++ source and header files within a package, excluding 'test' directories.
+    Load the compile_commands.json file generated for a package.
 
     Args:
-        package_path: The root path of the package.
+        package_name: Name of the package.
 
     Returns:
-        A list of Paths to C++ source and header files.
+        The list of compile command entries, or an empty list if the package
+        has no compile_commands.json.
     """
-    cpp_files: List[Path] = []
-
-    for root, dirs, files in os.walk(package_path):
-        current_root = Path(root)
-
-        # Exclude 'test' directories from traversal
-        dirs[:] = [directory for directory in dirs if directory.lower() != "test"]
-
-        for file_name in files:
-            file_path = current_root / file_name
-
-            if file_path.suffix.lower() in [".cpp", ".cc", ".c"]:
-                cpp_files.append(file_path)
+    compile_commands_path = Path("build") / package_name / "compile_commands.json"
+    try:
+        content = compile_commands_path.read_bytes()
+    except FileNotFoundError:
+        return []
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def list_translation_units(
+    package_name: str, package_path: Path
+) -> Dict[Path, Dict[str, str]]:
+    """
+    List the C++ source files of a package from its compile_commands.json.
 
-    return cpp_files
+    Only files inside the package directory are returned, and files under
+    'test' directories are excluded.
 
+    Args:
+        package_name: Name of the package.
+        package_path: The resolved root path of the package.
 
-def filter_cpp_files_by_compile_commands(cpp_files: List[Path], package_name: str):
-    """
-    Filter source files by the compile_commands.json file.
+    Returns:
+        A dictionary mapping Paths of C++ source files to their compile command
+        entries.
     """
-    compile_commands_json = json.load(
-        open(f"build/{package_name}/compile_commands.json")
-    )
-    builded_files = [Path(entry["file"]) for entry in compile_commands_json]
-    cpp_files = [path for path in cpp_files if path in builded_files]
+    cpp_files: Dict[Path, Dict[str, str]] = {}
+
+    for entry in load_compile_commands(package_name):
+        source_file = resolve_path(os.path.join(entry["directory"], entry["file"]))
+        if not source_file.name.lower().endswith(CPP_SOURCE_SUFFIXES):
+            continue
+        if not source_file.is_relative_to(package_path):
+            continue
+        relative_directories = source_file.relative_to(package_path).parts[:-1]
+        if any(directory.lower() == "test" for directory in relative_directories):
+            continue
+        cpp_files[source_file] = entry
+
     return cpp_files
 
 
@@ -112,16 +158,15 @@ class ClangTidyPackageScanner:
     def __init__(self):
         self.package_paths: Dict[str, Path] = {}
         self.package_cpp_files: Dict[str, List[Path]] = {}
+        self.compile_commands: Dict[Path, Dict[str, str]] = {}
 
         all_packages = get_all_packages()
         for package_name, package_path in all_packages.items():
-            cpp_files = find_cpp_files(package_path)
-            if len(cpp_files) == 0:
-                continue
-            cpp_files = filter_cpp_files_by_compile_commands(cpp_files, package_name)
-            if cpp_files:
+            translation_units = list_translation_units(package_name, package_path)
+            if translation_units:
                 self.package_paths[package_name] = package_path
-                self.package_cpp_files[package_name] = cpp_files
+                self.package_cpp_files[package_name] = list(translation_units)
+                self.compile_commands.update(translation_units)
 
     def apply_base_path_filter(self, base_path: str):
         """
@@ -159,11 +204,23 @@ class ClangTidyPackageScanner:
         return list(self.package_paths.keys())
 
 
+def default_job_count() -> int:
+    """
+    Determine the default number of parallel clang-tidy jobs.
+
+    Returns:
+        The number of CPUs available to this process, falling back to the
+        total CPU count on platforms without scheduler affinity support.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
 def build_clang_tidy_command(
     clang_tidy_cmd: str,
     package_name: str,
     package_path: str,
-    source_file: str,
     config: str,
     config_file: str,
     fix_errors: bool,
@@ -171,12 +228,14 @@ def build_clang_tidy_command(
     use_color: bool,
 ) -> List[str]:
     """
-    Construct the clang-tidy command with the provided parameters.
+    Construct the clang-tidy command for a package with the provided parameters.
+
+    The command is shared by every source file of the package; the source file
+    to analyze is appended to it.
 
     Args:
         package_name: Name of the package being processed.
         package_path: Path to the package directory.
-        source_file: Path to the C++ source or header file.
         config: Clang-tidy configuration string.
         config_file: Path to the clang-tidy configuration file.
         fix_errors: Flag to enable automatic fixing of errors.
@@ -204,13 +263,311 @@ def build_clang_tidy_command(
     if use_color:
         command += ["--use-color"]
 
-    command += [source_file]
-
     return command
 
 
-def parse_result(result: subprocess.CompletedProcess) -> str:
-    return f"Command: {' '.join(result.args)}\n{result.stderr}\n{result.stdout}\n"
+def parse_result(result: subprocess.CompletedProcess[bytes]) -> bytes:
+    return b"".join(
+        (
+            b"Command: ",
+            " ".join(result.args).encode(),
+            b"\n",
+            result.stderr,
+            b"\n",
+            result.stdout,
+            b"\n",
+        )
+    )
+
+
+def write_report(report: bytes):
+    """
+    Write a clang-tidy report to stdout without disturbing the progress bar.
+
+    The report is written as raw bytes, so clang-tidy output is never decoded.
+
+    Args:
+        report: The report to write.
+    """
+    with tqdm.tqdm.external_write_mode(file=sys.stdout):
+        sys.stdout.flush()
+        sys.stdout.buffer.write(report)
+        sys.stdout.buffer.write(b"\n")
+        sys.stdout.buffer.flush()
+
+
+def count_diagnostics(output: bytes) -> Tuple[int, int]:
+    """
+    Count the errors and warnings reported in clang-tidy output.
+
+    Args:
+        output: The standard output of a clang-tidy run.
+
+    Returns:
+        A tuple of error count and warning count.
+    """
+    return output.count(b"error: "), output.count(b"warning: ")
+
+
+def run_clang_tidy(
+    cmd: List[str],
+) -> Tuple[subprocess.CompletedProcess[bytes], int, int]:
+    """
+    Run clang-tidy and count the diagnostics it reports.
+
+    The output is kept as bytes; clang-tidy diagnostics are ASCII, so decoding
+    would only cost an extra pass over it.
+
+    Args:
+        cmd: The clang-tidy command to execute.
+
+    Returns:
+        A tuple of the completed process, error count, and warning count.
+    """
+    result = subprocess.run(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        check=False,  # Continue even if clang-tidy reports issues
+    )
+    error_count, warning_count = count_diagnostics(result.stdout)
+    return result, error_count, warning_count
+
+
+def get_file_signature(path: str) -> Optional[List[int]]:
+    """
+    Get the modification time and size of a file.
+
+    Args:
+        path: Path to the file.
+
+    Returns:
+        A list of the modification time in nanoseconds and the size in bytes,
+        or None if the file does not exist.
+    """
+    try:
+        stat_result = os.stat(path)
+    except OSError:
+        return None
+    return [stat_result.st_mtime_ns, stat_result.st_size]
+
+
+def update_hash(key_hash: hashlib.blake2b, data: bytes):
+    """
+    Feed length-prefixed data into a hash, so that consecutive fields cannot be
+    confused with one another.
+
+    Args:
+        key_hash: The hash to update.
+        data: The data to add.
+    """
+    key_hash.update(len(data).to_bytes(8, "little"))
+    key_hash.update(data)
+
+
+def parse_depfile(depfile_path: str) -> List[str]:
+    """
+    Parse the dependencies listed in a Makefile-style depfile.
+
+    Args:
+        depfile_path: Path to the depfile written by the compiler.
+
+    Returns:
+        A list of dependency paths, without the rule targets.
+    """
+    # Paths are not guaranteed to be valid UTF-8; keep undecodable bytes intact.
+    with open(depfile_path, errors="surrogateescape") as depfile:
+        content = depfile.read().replace("\\\n", " ")
+    tokens = re.split(r"(?<!\\)\s+", content)
+    return [
+        token.replace("\\ ", " ")
+        for token in tokens
+        if token and not token.endswith(":")
+    ]
+
+
+class ClangTidyResultCache:
+    """
+    Caches clang-tidy results keyed by the content of everything that affects them.
+
+    A key covers the clang-tidy command and version, the compile command entry,
+    the source file and every header listed in the depfile the compiler wrote
+    for the translation unit, and the .clang-tidy files that apply to it.
+    Translation units without a depfile are never cached.
+
+    The files a key was computed from are recorded in an index together with
+    their modification times and sizes. While none of them changed, the key is
+    reused without reading and hashing the files again.
+    """
+
+    def __init__(self, cache_dir: str, clang_tidy_cmd: str, config_file: str):
+        """
+        Create the cache directory and hash the inputs shared by every key.
+
+        Raises:
+            OSError: If the cache directory cannot be created, clang-tidy cannot
+                be executed, or the configuration file cannot be read.
+        """
+        self.cache_dir = Path(cache_dir).expanduser()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        version = subprocess.run(
+            [clang_tidy_cmd, "--version"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            check=False,
+        ).stdout
+        self._base_hash = hashlib.blake2b(digest_size=16)
+        update_hash(self._base_hash, version.encode())
+        if config_file:
+            update_hash(self._base_hash, Path(config_file).read_bytes())
+
+        self._index_path = self.cache_dir / "index.json"
+        self._index_lock = threading.Lock()
+        try:
+            with open(self._index_path) as index_file:
+                self._index: Dict[str, Dict] = json.load(index_file)
+        except (OSError, ValueError):
+            self._index = {}
+
+    def compute_key(self, command: List[str], entry: Dict[str, str]) -> Optional[str]:
+        """
+        Compute the cache key of a clang-tidy run.
+
+        Args:
+            command: The clang-tidy command.
+            entry: The compile command entry of the source file being analyzed.
+
+        Returns:
+            The cache key, or None if the dependencies of the source file are unknown
+            or cannot be read.
+        """
+        if "output" not in entry:
+            return None
+        depfile_path = os.path.join(entry["directory"], entry["output"] + ".d")
+        source_file = resolve_path(os.path.join(entry["directory"], entry["file"]))
+        config_paths = [
+            str(directory / ".clang-tidy")
+            for directory in source_file.parents
+            if (directory / ".clang-tidy").is_file()
+        ]
+
+        key_hash = self._base_hash.copy()
+        update_hash(key_hash, json.dumps(command).encode())
+        update_hash(key_hash, json.dumps(entry, sort_keys=True).encode())
+        index_key = key_hash.hexdigest()
+
+        with self._index_lock:
+            indexed = self._index.get(index_key)
+        if (
+            indexed is not None
+            and indexed["configs"] == config_paths
+            and all(
+                get_file_signature(path) == signature
+                for path, signature in indexed["files"].items()
+            )
+        ):
+            return indexed["key"]
+
+        # The depfile is part of the signature, so an unchanged depfile also
+        # guarantees an unchanged list of dependencies.
+        signatures = {depfile_path: get_file_signature(depfile_path)}
+        try:
+            for dependency in [entry["file"]] + parse_depfile(depfile_path):
+                dependency_path = os.path.join(entry["directory"], dependency)
+                signatures[dependency_path] = get_file_signature(dependency_path)
+                update_hash(key_hash, os.fsencode(dependency_path))
+                update_hash(key_hash, Path(dependency_path).read_bytes())
+            for config_path in config_paths:
+                signatures[config_path] = get_file_signature(config_path)
+                update_hash(key_hash, os.fsencode(config_path))
+                update_hash(key_hash, Path(config_path).read_bytes())
+        except (OSError, ValueError):
+            return None
+
+        key = key_hash.hexdigest()
+        with self._index_lock:
+            self._index[index_key] = {
+                "key": key,
+                "configs": config_paths,
+                "files": signatures,
+            }
+        return key
+
+    def save_index(self):
+        """
+        Write the file signature index to the cache directory.
+        """
+        temporary_path = self._index_path.with_suffix(".tmp")
+        with self._index_lock:
+            with open(temporary_path, "w") as index_file:
+                json.dump(self._index, index_file)
+        os.replace(temporary_path, self._index_path)
+
+    def load(self, key: str) -> Optional[Tuple[int, bytes, bytes]]:
+        """
+        Load a cached clang-tidy result.
+
+        Args:
+            key: The cache key.
+
+        Returns:
+            A tuple of return code, stdout, and stderr, or None on a cache miss.
+        """
+        try:
+            with open(self.cache_dir / f"{key}.json") as cache_file:
+                cached = json.load(cache_file)
+        except (OSError, ValueError):
+            return None
+        return (
+            cached["returncode"],
+            cached["stdout"].encode("utf-8", "surrogateescape"),
+            cached["stderr"].encode("utf-8", "surrogateescape"),
+        )
+
+    def store(self, key: str, result: subprocess.CompletedProcess[bytes]):
+        """
+        Store a clang-tidy result in the cache.
+
+        Args:
+            key: The cache key.
+            result: The completed clang-tidy process.
+
+        Raises:
+            OSError: If the result cannot be written.
+        """
+        cache_path = self.cache_dir / f"{key}.json"
+        temporary_path = cache_path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            with open(temporary_path, "w") as cache_file:
+                json.dump(
+                    {
+                        "returncode": result.returncode,
+                        "stdout": result.stdout.decode("utf-8", "surrogateescape"),
+                        "stderr": result.stderr.decode("utf-8", "surrogateescape"),
+                    },
+                    cache_file,
+                )
+            os.replace(temporary_path, cache_path)
+        finally:
+            temporary_path.unlink(missing_ok=True)
+
+
+def get_file_size(path: Path) -> int:
+    """
+    Get the size of a file, used as an estimate of how long clang-tidy takes on it.
+
+    Args:
+        path: Path to the file.
+
+    Returns:
+        The file size in bytes, or 0 if it cannot be determined.
+    """
+    try:
+        return path.stat().st_size
+    except OSError:
+        return 0
 
 
 def process_packages(scanner: ClangTidyPackageScanner, args):
@@ -221,100 +578,153 @@ def process_packages(scanner: ClangTidyPackageScanner, args):
         scanner: Instance of ClangTidyPackageScanner with package information.
         args: Command-line arguments.
     """
-    from concurrent.futures import ThreadPoolExecutor
-
     total_errors = 0
     total_warnings = 0
-    clang_tidy_commands = []
-    package_file_map = {}
+    clang_tidy_commands: List[Tuple[str, Path, List[str]]] = []
+
+    # Fixes are applied as a side effect of running clang-tidy, so such runs
+    # must never be replaced by a cached result.
+    result_cache = None
+    if args.cache_dir and not (args.fix_errors or args.export_fixes):
+        try:
+            result_cache = ClangTidyResultCache(
+                args.cache_dir, args.clang_tidy_cmd, args.config_file
+            )
+        except OSError as error:
+            print(f"Result cache disabled: {error}", file=sys.stderr)
 
     # Collect all clang-tidy commands across all packages
     for package_name in scanner.list_available_packages():
         package_path = scanner.package_paths[package_name]
         cpp_files = scanner.package_cpp_files[package_name]
-        package_file_map.update({str(file): package_name for file in cpp_files})
 
+        package_command = build_clang_tidy_command(
+            clang_tidy_cmd=args.clang_tidy_cmd,
+            package_name=package_name,
+            package_path=str(package_path),
+            config=args.config,
+            config_file=args.config_file,
+            fix_errors=args.fix_errors,
+            export_fixes_path=args.export_fixes,
+            use_color=args.use_color,
+        )
         for source_file in cpp_files:
-            command = build_clang_tidy_command(
-                clang_tidy_cmd=args.clang_tidy_cmd,
-                package_name=package_name,
-                package_path=str(package_path),
-                source_file=str(source_file),
-                config=args.config,
-                config_file=args.config_file,
-                fix_errors=args.fix_errors,
-                export_fixes_path=args.export_fixes,
-                use_color=args.use_color,
-            )
-            clang_tidy_commands.append((package_name, command))
+            command = package_command + [str(source_file)]
+            clang_tidy_commands.append((package_name, source_file, command))
+
+    # Start the largest translation units first so that long-running files do
+    # not end up as stragglers after the rest of the pool has gone idle.
+    clang_tidy_commands.sort(
+        key=lambda cmd_info: get_file_size(cmd_info[1]), reverse=True
+    )
 
     def execute_command(
-        cmd_info: Tuple[str, List[str]]
-    ) -> Tuple[str, subprocess.CompletedProcess[str]]:
+        cmd_info: Tuple[str, Path, List[str]]
+    ) -> Tuple[str, bytes, int, int]:
         """
-        Execute a single clang-tidy command.
+        Execute a single clang-tidy command and summarize its output.
+
+        Diagnostics are counted while the output is streamed and the report is
+        formatted inside the worker, so the main thread only has to print it.
 
         Args:
-            cmd_info: A tuple containing package name and the command to execute.
+            cmd_info: A tuple containing package name, source file, and the command
+                to execute.
 
         Returns:
-            A tuple of package name, combined output, and the error count.
+            A tuple of package name, formatted report (empty if there is nothing
+            to show), error count, and warning count.
         """
-        package_name, cmd = cmd_info
-        try:
-            result = subprocess.run(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                check=False,  # Continue even if clang-tidy reports issues
+        package_name, source_file, cmd = cmd_info
+        cache_key = None
+        cached = None
+        if result_cache is not None:
+            cache_key = result_cache.compute_key(
+                cmd, scanner.compile_commands[source_file]
             )
+            if cache_key is not None:
+                cached = result_cache.load(cache_key)
 
-            has_some_output = len(result.stdout) > 0 or len(result.stderr) > 0
-
-            if args.output_dir:
-                os.makedirs(args.output_dir, exist_ok=True)
-                if args.output_all or has_some_output:
-                    log_file_path = os.path.join(args.output_dir, f"{package_name}.log")
-                    with open(log_file_path, "a") as log_file:
-                        log_file.write(parse_result(result))
-
-            return package_name, result
-
-        except Exception as error:
-            return (
-                package_name,
-                subprocess.CompletedProcess(
-                    args=cmd, returncode=1, stdout="", stderr=str(error)
-                ),
+        if cached is not None:
+            returncode, stdout, stderr = cached
+            result = subprocess.CompletedProcess(
+                args=cmd, returncode=returncode, stdout=stdout, stderr=stderr
             )
-
-    # Use a shared thread pool to execute all commands
-    with ThreadPoolExecutor(max_workers=args.jobs) as executor:
-        results = list(
-            tqdm.tqdm(
+            error_count, warning_count = count_diagnostics(result.stdout)
+        else:
+            try:
+                result, error_count, warning_count = run_clang_tidy(cmd)
+            except Exception as error:
+                result = subprocess.CompletedProcess(
+                    args=cmd, returncode=1, stdout=b"", stderr=str(error).encode()
+                )
+                error_count, warning_count = 0, 0
+            else:
+                if cache_key is not None:
+                    try:
+                        result_cache.store(cache_key, result)
+                    except OSError as error:
+                        tqdm.tqdm.write(
+                            f"Failed to cache the result of {source_file}: {error}",
+                            file=sys.stderr,
+                        )
+
+        has_some_output = len(result.stdout) > 0 or len(result.stderr) > 0
+        report = parse_result(result) if args.output_all or has_some_output else b""
+
+        if args.output_dir and report:
+            with log_locks[package_name]:
+                if package_name not in log_files:
+                    log_file_path = os.path.join(args.output_dir, f"{package_name}.log")
+                    log_files[package_name] = open(
+                        log_file_path, "ab", buffering=LOG_BUFFER_SIZE
+                    )
+                log_files[package_name].write(report)
+
+        return package_name, report, error_count, warning_count
+
+    # Each package log is opened once, on its first write, and shared by the
+    # workers under a per-package lock.
+    log_files: Dict[str, BinaryIO] = {}
+    log_locks = {
+        package_name: threading.Lock()
+        for package_name in scanner.list_available_packages()
+    }
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    # Use a shared thread pool to execute all commands. Results are reported
+    # as they arrive so that only the reports still in flight are kept in memory.
+    try:
+        with ThreadPoolExecutor(max_workers=args.jobs) as executor:
+            for package_name, report, error_count, warning_count in tqdm.tqdm(
                 executor.map(execute_command, clang_tidy_commands),
                 total=len(clang_tidy_commands),
                 desc="Running clang-tidy",
-            )
-        )
-
-    # Collect and process results
-    package_errors = {}
-    for package_name, result in results:
-        error_count = result.stdout.count("error: ")
-        warning_count = result.stdout.count("warning: ")
-        total_errors += error_count
-        total_warnings += warning_count
-        if package_name not in package_errors:
-            package_errors[package_name] = 0
-        package_errors[package_name] += error_count
-
-        if args.output_all or len(result.stdout) > 0 or len(result.stderr) > 0:
-            print(parse_result(result))
-
-        if args.output_all or error_count > 0 or warning_count > 0:
-            print(f"{package_name}: {error_count} errors, {warning_count} warnings")
+                # Redraw at most ~200 times so the bar stays cheap at high --jobs
+                mininterval=0.5,
+                miniters=max(1, len(clang_tidy_commands) // 200),
+                smoothing=0,
+            ):
+                total_errors += error_count
+                total_warnings += warning_count
+
+                if report:
+                    write_report(report)
+
+                if args.output_all or error_count > 0 or warning_count > 0:
+                    tqdm.tqdm.write(
+                        f"{package_name}: {error_count} errors, "
+                        f"{warning_count} warnings"
+                    )
+    finally:
+        for log_file in log_files.values():
+            log_file.close()
+        if result_cache is not None:
+            try:
+                result_cache.save_index()
+            except OSError as error:
+                print(f"Failed to save the cache index: {error}", file=sys.stderr)
 
     return total_errors, total_warnings
 
@@ -351,8 +761,11 @@ def main():
         "--jobs",
         "-j",
         type=int,
-        default=1,
-        help="Number of clang-tidy jobs to run in parallel.",
+        default=default_job_count(),
+        help=(
+            "Number of clang-tidy jobs to run in parallel. Defaults to the number "
+            "of available CPUs; pass it explicitly on managed hosts (e.g. SLURM, LSF)."
+        ),
     )
     parser.add_argument(
         "--explain-config",
@@ -394,6 +807,15 @@ def main():
         default=None,
         help="Directory where clang-tidy outputs will be stored.",
     )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help=(
+            "Directory where clang-tidy results are cached and reused while the "
+            "sources, headers, and configuration are unchanged."
+        ),
+    )
     parser.add_argument(
         "--use-color",
         action="store_true",